@@ -1,7 +1,11 @@
 import time
 import re
 import os
-from dataclasses import dataclass
+import json
+import threading
+import urllib.request
+from collections import deque
+from dataclasses import dataclass, field
 from typing import List, Optional, Tuple
 
 from selenium import webdriver
@@ -11,24 +15,46 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.chrome.service import Service
+from selenium.webdriver.remote.webelement import WebElement
 
 from webdriver_manager.chrome import ChromeDriverManager
 
+from websockets.sync.client import connect as ws_connect
+
+import ahocorasick
+import xxhash
+
 import winsound
 
 
+_WS = re.compile(r"\s+")
+
+
+def normalize(text: str) -> str:
+    return _WS.sub(" ", text).strip().lower()
+
+
 # ===================== CONFIG =====================
 
 @dataclass
 class Config:
     group_name: str
     keywords: List[str]
-    poll_seconds: float = 1.0
+    poll_seconds: float = 1.0       # base interval; backs off towards max_poll_seconds when idle
+    max_poll_seconds: float = 5.0
+    busy_poll_seconds: float = 0.25  # used right after a new message arrives
     alarm_beeps: int = 6
     beep_freq_hz: int = 1400
     beep_ms: int = 300
     wav_path: Optional[str] = None
+    scroll_after_idle_seconds: float = 30.0  # nudge the chat to the bottom after this long without messages
+    headless: bool = True  # set False for the first run so the QR code can be scanned
     chrome_user_data_dir = os.path.join(os.environ["LOCALAPPDATA"], "WhatsAppVibeProfile")
+    keywords_norm: Tuple[str, ...] = field(init=False)
+
+    def __post_init__(self):
+        # Keywords are fixed for the run: normalize them once here, not per message
+        self.keywords_norm = tuple(normalize(kw) for kw in self.keywords)
 
 
 cfg = Config(
@@ -41,39 +67,124 @@ cfg = Config(
     wav_path=None  # Example: r"C:\Windows\Media\Alarm01.wav"
 )
 
+# ===================== LOCATORS =====================
+# CSS instead of XPath: the browser answers these with native querySelectorAll.
+
+MSG_BLOCK_CSS = "div[data-pre-plain-text]"
+COMPOSER_CSS = "footer div[contenteditable='true']"
+
+MSG_BLOCKS = (By.CSS_SELECTOR, MSG_BLOCK_CSS)
+COMPOSER = (By.CSS_SELECTOR, COMPOSER_CSS)
+SEARCH_BOX = (By.CSS_SELECTOR, "[aria-label='Search input textbox']")
+SEARCH_BOX_FALLBACK = (By.CSS_SELECTOR, "div[contenteditable='true'][role='textbox']")
+CHAT_LIST = (By.CSS_SELECTOR, "div[role='grid']")
+SELECTABLE_TEXT = (By.CSS_SELECTOR, "span[class*='selectable-text'] > span")
+APPLICATION_ROOT = (By.CSS_SELECTOR, "[role='application']")
+COPYABLE_TEXT = (By.CSS_SELECTOR, "[class*='copyable-text']")
+
+
+def group_title_css(group_name: str) -> str:
+    escaped = group_name.replace("\\", "\\\\").replace('"', '\\"')
+    return f'span[title="{escaped}"]'
+
+
+def group_title_locator(group_name: str) -> Tuple[str, str]:
+    return (By.CSS_SELECTOR, group_title_css(group_name))
+
 # ==================================================
 
 
-def normalize(text: str) -> str:
-    return re.sub(r"\s+", " ", text).strip().lower()
+def build_keyword_automaton(keywords: List[str], keywords_norm: Tuple[str, ...]) -> ahocorasick.Automaton:
+    """Aho–Corasick automaton over the normalized keywords; values are the original keywords."""
+    automaton = ahocorasick.Automaton()
+    for kw, norm in zip(keywords, keywords_norm):
+        if norm:
+            automaton.add_word(norm, kw)
+    automaton.make_automaton()
+    return automaton
 
 
-def keyword_hit(text: str, keywords: List[str]) -> Optional[str]:
-    t = normalize(text)
-    for kw in keywords:
-        if normalize(kw) in t:
-            return kw
+def keyword_hit(text: str, automaton: ahocorasick.Automaton) -> Optional[str]:
+    """Single pass over the text regardless of how many keywords there are."""
+    if len(automaton) == 0:
+        return None
+    for _, kw in automaton.iter(normalize(text)):
+        return kw
     return None
 
 
+_alarm_lock = threading.Lock()
+
+
+def _beep_worker(cfg: Config):
+    try:
+        for _ in range(cfg.alarm_beeps):
+            winsound.Beep(cfg.beep_freq_hz, cfg.beep_ms)
+            time.sleep(0.05)  # keeps the beeps distinct; we're off the poll loop anyway
+
+        if cfg.wav_path:
+            try:
+                winsound.PlaySound(cfg.wav_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
+            except Exception as e:
+                print(f"[WARN] Could not play WAV: {e}")
+    finally:
+        _alarm_lock.release()
+
+
 def play_alarm(cfg: Config):
+    """Sound the alarm on a background thread so polling keeps running."""
+    if not _alarm_lock.acquire(blocking=False):
+        return  # an alarm is already sounding
     print("🔔 Playing alarm...")
-    for _ in range(cfg.alarm_beeps):
-        winsound.Beep(cfg.beep_freq_hz, cfg.beep_ms)
-        time.sleep(0.05)
-
-    if cfg.wav_path:
-        try:
-            winsound.PlaySound(cfg.wav_path, winsound.SND_FILENAME | winsound.SND_ASYNC)
-        except Exception as e:
-            print(f"[WARN] Could not play WAV: {e}")
+    threading.Thread(target=_beep_worker, args=(cfg,), daemon=True).start()
 
 
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from webdriver_manager.chrome import ChromeDriverManager
+from selenium.common.exceptions import SessionNotCreatedException
 import os
 
+# Media the monitor never looks at: avatars, stickers, voice notes, web fonts
+BLOCKED_URL_PATTERNS = [
+    "*.jpg", "*.jpeg", "*.png", "*.gif", "*.webp",
+    "*.mp4", "*.mp3", "*.ogg",
+    "*.woff", "*.woff2", "*.ttf",
+]
+
+# Re-ask webdriver_manager for a chromedriver at most once a week
+DRIVER_RECHECK_SECONDS = 7 * 24 * 3600
+
+
+def _chromedriver_path_file(cfg) -> str:
+    return os.path.join(cfg.chrome_user_data_dir, "chromedriver.path")
+
+
+def resolve_chromedriver(cfg) -> Tuple[str, bool]:
+    """
+    Reuse the last installed chromedriver path so startup needs no network round-trip.
+    Returns (path, from_cache).
+    """
+    path_file = _chromedriver_path_file(cfg)
+    try:
+        if time.time() - os.path.getmtime(path_file) < DRIVER_RECHECK_SECONDS:
+            with open(path_file, encoding="utf-8") as f:
+                cached = f.read().strip()
+            if cached and os.path.isfile(cached):
+                return cached, True
+    except OSError:
+        pass
+
+    driver_path = ChromeDriverManager().install()
+    try:
+        os.makedirs(cfg.chrome_user_data_dir, exist_ok=True)
+        with open(path_file, "w", encoding="utf-8") as f:
+            f.write(driver_path)
+    except OSError as e:
+        print(f"[WARN] Could not cache chromedriver path: {e}")
+    return driver_path, False
+
+
 def build_driver(cfg):
     chrome_options = Options()
 
@@ -85,37 +196,211 @@ def build_driver(cfg):
     chrome_options.add_argument("--disable-notifications")
     chrome_options.add_argument("--remote-allow-origins=*")
 
+    # Nothing needs to be seen once logged in; skip compositing/painting a window
+    if cfg.headless:
+        chrome_options.add_argument("--headless=new")
+        chrome_options.add_argument("--window-size=1280,900")
+
     # Use a safe absolute profile folder
     profile_path = os.path.abspath(cfg.chrome_user_data_dir)
     chrome_options.add_argument(f"--user-data-dir={profile_path}")
 
-    # Optional: avoid automation detection oddities
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
+    # Optional: avoid automation detection oddities; "enable-logging" also stops Chrome's console log spam
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation", "enable-logging"])
     chrome_options.add_experimental_option("useAutomationExtension", False)
 
-    service = Service(ChromeDriverManager().install())
-    return webdriver.Chrome(service=service, options=chrome_options)
+    # Skip image decoding and notification prompts entirely
+    chrome_options.add_experimental_option("prefs", {
+        "profile.managed_default_content_settings.images": 2,
+        "profile.default_content_setting_values.notifications": 2,
+    })
+
+    # No chromedriver log file; Selenium 4 already keeps one pooled keep-alive connection to it
+    driver_path, from_cache = resolve_chromedriver(cfg)
+    service = Service(driver_path, log_output=os.devnull)
+    try:
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+    except SessionNotCreatedException as e:
+        # Only a version mismatch with a cached driver is worth a re-download (Chrome auto-updated);
+        # anything else, e.g. the profile still being in use, would just fail again
+        if not (from_cache and "only supports Chrome version" in (e.msg or "")):
+            raise
+        print(f"[WARN] Cached chromedriver does not match Chrome ({e.msg}); re-resolving...")
+        try:
+            os.remove(_chromedriver_path_file(cfg))
+        except OSError:
+            pass
+        driver_path, _ = resolve_chromedriver(cfg)
+        service = Service(driver_path, log_output=os.devnull)
+        driver = webdriver.Chrome(service=service, options=chrome_options)
+
+    # Headless Chrome announces itself as "HeadlessChrome", which WhatsApp Web refuses;
+    # present the same browser's regular UA so the version always matches the real one
+    if cfg.headless:
+        ua = driver.execute_cdp_cmd("Browser.getVersion", {})["userAgent"]
+        driver.execute_cdp_cmd("Network.setUserAgentOverride",
+                               {"userAgent": ua.replace("HeadlessChrome", "Chrome")})
+
+    # Also drop media/font requests at the network layer
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+    except Exception as e:
+        print(f"[WARN] Could not block media requests: {e}")
+
+    return driver
+
+
+# Upper bound for one CDP reply; a hung renderer must not stall the loop forever
+CDP_TIMEOUT_SECONDS = 30
+
+
+class CdpSession:
+    """
+    Minimal Chrome DevTools Protocol client attached straight to the WhatsApp tab.
+    Skips the Selenium -> chromedriver HTTP hop for the hot polling path.
+    """
+
+    def __init__(self, debugger_address: str, url_prefix: str = "https://web.whatsapp.com"):
+        # debugger_address is chromedriver's own DevTools endpoint ("host:port") for this browser
+        with urllib.request.urlopen(f"http://{debugger_address}/json", timeout=5) as resp:
+            targets = json.load(resp)
+
+        ws_url = next(
+            (t["webSocketDebuggerUrl"] for t in targets
+             if t.get("type") == "page" and t.get("url", "").startswith(url_prefix)),
+            None,
+        )
+        if not ws_url:
+            raise RuntimeError(f"No DevTools page target found for {url_prefix}")
+
+        self._ws = ws_connect(ws_url, max_size=None)
+        self._next_id = 0
+        self._scripts = {}  # expression -> compiled scriptId
 
+        # compileScript/runScript are refused until the Runtime agent is enabled;
+        # the events it emits afterwards are skipped by send()
+        self.send("Runtime.enable")
 
-def wait_for_whatsapp_ready(driver):
+    def send(self, method: str, params: Optional[dict] = None) -> dict:
+        self._next_id += 1
+        call_id = self._next_id
+        self._ws.send(json.dumps({"id": call_id, "method": method, "params": params or {}}))
+
+        deadline = time.monotonic() + CDP_TIMEOUT_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f"CDP {method} got no reply within {CDP_TIMEOUT_SECONDS}s")
+            reply = json.loads(self._ws.recv(timeout=remaining))
+            if reply.get("id") != call_id:
+                continue  # protocol event, not our answer
+            if "error" in reply:
+                raise RuntimeError(f"CDP {method} failed: {reply['error'].get('message')}")
+            return reply.get("result", {})
+
+    @staticmethod
+    def _value(result: dict):
+        if "exceptionDetails" in result:
+            raise RuntimeError(f"JS error: {result['exceptionDetails'].get('text')}")
+        return result.get("result", {}).get("value")
+
+    def evaluate(self, expression: str):
+        return self._value(self.send("Runtime.evaluate", {"expression": expression, "returnByValue": True}))
+
+    def _compile(self, expression: str) -> str:
+        result = self.send("Runtime.compileScript", {
+            "expression": expression, "sourceURL": "", "persistScript": True,
+        })
+        if "exceptionDetails" in result:
+            raise RuntimeError(f"JS compile error: {result['exceptionDetails'].get('text')}")
+        self._scripts[expression] = result["scriptId"]
+        return result["scriptId"]
+
+    def run_compiled(self, expression: str):
+        """Like evaluate(), but the expression is parsed once and re-run by scriptId."""
+        script_id = self._scripts.get(expression) or self._compile(expression)
+        try:
+            result = self.send("Runtime.runScript", {"scriptId": script_id, "returnByValue": True})
+        except RuntimeError as e:
+            # Compiled scripts die with their execution context (page reload): compile again
+            if "No script with given id" not in str(e):
+                raise
+            result = self.send("Runtime.runScript", {"scriptId": self._compile(expression), "returnByValue": True})
+        return self._value(result)
+
+    def close(self):
+        try:
+            self._ws.close()
+        except Exception:
+            pass
+
+
+def wait_for_whatsapp_ready(driver, headless: bool = False):
     driver.get("https://web.whatsapp.com/")
     wait = WebDriverWait(driver, 180)
 
     print("[INFO] Waiting for WhatsApp Web... (scan QR if needed)")
     # Wait until either chat search or chat list appears
-    wait.until(
-        EC.any_of(
-            EC.presence_of_element_located((By.XPATH, "//*[@aria-label='Search input textbox']")),
-            EC.presence_of_element_located((By.XPATH, "//div[@role='grid']")),
-            EC.presence_of_element_located((By.XPATH, "//div[@data-pre-plain-text]")),
+    try:
+        wait.until(
+            EC.any_of(
+                EC.presence_of_element_located(SEARCH_BOX),
+                EC.presence_of_element_located(CHAT_LIST),
+                EC.presence_of_element_located(MSG_BLOCKS),
+            )
         )
-    )
+    except TimeoutException:
+        if headless:
+            print("[ERROR] WhatsApp Web did not load in headless mode. If this profile has never "
+                  "been logged in, set headless=False in the config, run once and scan the QR code, "
+                  "then switch headless back on.")
+        raise
     print("[INFO] WhatsApp appears ready.")
 
 
 from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
 
-def open_group_chat(driver, group_name: str):
+# Resolves as soon as every selector matches, instead of chromedriver polling every 0.5 s.
+_WAIT_FOR_SELECTORS_JS = """
+const [selectors, timeoutMs, done] = arguments;
+const ready = () => selectors.every(sel => document.querySelector(sel));
+if (ready()) { done(true); return; }
+const obs = new MutationObserver(() => {
+    if (ready()) { obs.disconnect(); clearTimeout(timer); done(true); }
+});
+const timer = setTimeout(() => { obs.disconnect(); done(false); }, timeoutMs);
+obs.observe(document.body, {subtree: true, childList: true, attributes: true, attributeFilter: ['title']});
+"""
+
+
+_CLEAR_EDITABLE_JS = (
+    "arguments[0].focus();"
+    "document.execCommand('selectAll', false, null);"
+    "document.execCommand('delete', false, null);"
+)
+
+
+def wait_for_selectors(driver, selectors: List[str], timeout: float):
+    """Block in one round-trip until all CSS selectors are present in the page."""
+    previous = driver.timeouts.script
+    driver.set_script_timeout(timeout + 5)
+    try:
+        found = driver.execute_async_script(_WAIT_FOR_SELECTORS_JS, selectors, int(timeout * 1000))
+    finally:
+        driver.set_script_timeout(previous)
+    if not found:
+        raise TimeoutException(f"Timed out waiting for {selectors}")
+
+
+@dataclass
+class Handles:
+    """Elements of the opened chat that the monitor loop keeps reusing."""
+    composer: WebElement
+    search: WebElement
+
+
+def open_group_chat(driver, group_name: str) -> Handles:
     wait = WebDriverWait(driver, 60)
     print(f"[INFO] Opening group chat: {group_name}")
 
@@ -124,31 +409,28 @@ def open_group_chat(driver, group_name: str):
         try:
             # Click the search box (use stable aria label if present, else fallback)
             try:
-                search = wait.until(EC.presence_of_element_located(
-                    (By.XPATH, "//*[@aria-label='Search input textbox']")
-                ))
+                search = wait.until(EC.presence_of_element_located(SEARCH_BOX))
             except TimeoutException:
-                search = wait.until(EC.presence_of_element_located(
-                    (By.XPATH, "//div[@contenteditable='true'][@role='textbox']")
-                ))
+                search = wait.until(EC.presence_of_element_located(SEARCH_BOX_FALLBACK))
 
             search.click()
             time.sleep(0.2)
-            search.send_keys(Keys.CONTROL, "a")
-            search.send_keys(Keys.BACKSPACE)
-            search.send_keys(group_name)
-            time.sleep(1.0)
+            # Clear in-page and type the whole name in one CDP call instead of per-key events
+            driver.execute_script(_CLEAR_EDITABLE_JS, search)
+            driver.execute_cdp_cmd("Input.insertText", {"text": group_name})
+            time.sleep(1.0)  # let the chat list settle on the filtered results
 
             # IMPORTANT: re-locate right before click (prevents stale click)
-            chat_xpath = f"//span[@title={repr(group_name)}]"
-            wait.until(EC.presence_of_element_located((By.XPATH, chat_xpath)))
-            chat = wait.until(EC.element_to_be_clickable((By.XPATH, chat_xpath)))
+            title_css = group_title_css(group_name)
+            wait_for_selectors(driver, [title_css], 60)
+            chat = wait.until(EC.element_to_be_clickable(group_title_locator(group_name)))
             chat.click()
 
             # Wait until message composer exists => chat opened
-            wait.until(EC.presence_of_element_located((By.XPATH, "//footer//div[@contenteditable='true']")))
+            wait_for_selectors(driver, [title_css, COMPOSER_CSS], 60)
+            composer = driver.find_element(*COMPOSER)
             print(f"[INFO] Group opened successfully on attempt {attempt}.")
-            return
+            return Handles(composer=composer, search=search)
 
         except StaleElementReferenceException:
             print(f"[WARN] Stale element (attempt {attempt}), retrying...")
@@ -164,65 +446,174 @@ def open_group_chat(driver, group_name: str):
 
 
 
-def scroll_chat_to_bottom(driver):
+def scroll_chat_to_bottom(driver, handles: Handles):
     """Keep chat at bottom so new messages load into DOM."""
-    try:
-        box = driver.find_element(By.XPATH, "//footer//div[@contenteditable='true']")
+    def _scroll(box):
         box.click()
         time.sleep(0.05)
         box.send_keys(Keys.END)
         box.send_keys(Keys.CONTROL, Keys.END)
+
+    try:
+        try:
+            _scroll(handles.composer)
+        except StaleElementReferenceException:
+            # WhatsApp re-rendered the footer: refresh the cached handle once
+            handles.composer = driver.find_element(*COMPOSER)
+            _scroll(handles.composer)
     except Exception:
         pass
 
 
-def get_messages(driver):
-    """
-    Works when data-pre-plain-text exists but selectable-text spans do NOT.
-    Returns list of (msg_id, sender, text).
-    """
-    results = []
+# Shared in-page mapper: message block element -> {m: meta, t: text}.
+# textContent doesn't force a layout like innerText does; innerText is only the last resort.
+_BLOCK_TO_ITEM_JS = """(b => {
+    const span = b.querySelector('span.selectable-text');
+    const text = ((span && span.textContent) || b.textContent || '').trim();
+    return {m: b.getAttribute('data-pre-plain-text') || '', t: text || b.innerText || ''};
+})"""
 
-    blocks = driver.find_elements(By.XPATH, "//div[@data-pre-plain-text]")
-    for b in blocks:
-        try:
-            meta = (b.get_attribute("data-pre-plain-text") or "").strip()
-            # Sender from meta: "[HH:MM, DD/MM/YYYY] Name: "
-            sender = "Unknown"
-            if "] " in meta:
-                after = meta.split("] ", 1)[-1]
-                if ": " in after:
-                    sender = after.split(": ", 1)[0].strip()
+# Pull meta + text for every message block in one round-trip instead of 1+2N WebDriver calls.
+# All snippets below are CDP Runtime.evaluate expressions (no top-level return).
+_EXTRACT_MESSAGES_JS = (
+    f"Array.from(document.querySelectorAll('{MSG_BLOCK_CSS}'))"
+    f".map({_BLOCK_TO_ITEM_JS})"
+)
 
-            # IMPORTANT: Use full visible text of the block
-            text = (b.text or "").strip()
+# Push every message block added to the DOM into window.__wa_q. (Re)installs itself when the
+# observer is missing (page reload) or its root got detached (WhatsApp re-mounted the panel);
+# with rescan=true the blocks already on screen are queued too. Blocks are re-queued whenever their
+# content changes; seen_ids filters the unchanged repeats.
+_ENSURE_OBSERVER_JS = f"""(rescan => {{
+if (window.__wa_observer && window.__wa_root && window.__wa_root.isConnected) return;
+if (window.__wa_observer) window.__wa_observer.disconnect();
+const toItem = {_BLOCK_TO_ITEM_JS};
+window.__wa_q = (window.__wa_q || []).concat(
+    rescan ? Array.from(document.querySelectorAll('{MSG_BLOCK_CSS}')).map(toItem) : []
+);
+const root = document.querySelector('div[role="application"]') || document.body;
+window.__wa_root = root;
+// A block counts as changed when it is added, gains children (e.g. the decrypted text replacing
+// "Waiting for this message") or has its text edited in place.
+const enclosing = n => (n.nodeType === Node.ELEMENT_NODE ? n : n.parentElement)?.closest('{MSG_BLOCK_CSS}');
+window.__wa_observer = new MutationObserver(muts => {{
+    const blocks = new Set();
+    for (const m of muts) {{
+        const b = enclosing(m.target);
+        if (b) blocks.add(b);
+        for (const n of m.addedNodes) {{
+            const own = enclosing(n);
+            if (own) blocks.add(own);
+            if (n.querySelectorAll) n.querySelectorAll('{MSG_BLOCK_CSS}').forEach(x => blocks.add(x));
+        }}
+    }}
+    blocks.forEach(b => window.__wa_q.push(toItem(b)));
+}});
+window.__wa_observer.observe(root, {{subtree: true, childList: true, characterData: true}});
+}})"""
+
+_INSTALL_OBSERVER_JS = f"{_ENSURE_OBSERVER_JS}(false)"
+
+_DRAIN_QUEUE_JS = (
+    f"(() => {{ {_ENSURE_OBSERVER_JS}(true); "
+    "const q = window.__wa_q; window.__wa_q = []; return q; })()"
+)
 
-            # WhatsApp sometimes includes the time or blank lines—filter empty
-            if not text:
-                continue
 
-            msg_id = f"{meta}|{text}"
-            results.append((msg_id, sender, text))
+def message_id(meta: str, text: str) -> int:
+    """64-bit fingerprint of a message; far smaller than keeping meta|text strings around."""
+    return xxhash.xxh64_intdigest(meta.encode() + b"\0" + text.encode())
 
-        except Exception:
+
+class SeenIds:
+    """Set of message ids that forgets the oldest entries beyond maxlen."""
+
+    def __init__(self, maxlen: int = 10_000):
+        self._order = deque()
+        self._ids = set()
+        self._maxlen = maxlen
+
+    def add(self, msg_id: int):
+        if msg_id in self._ids:
+            return
+        self._ids.add(msg_id)
+        self._order.append(msg_id)
+        if len(self._order) > self._maxlen:
+            self._ids.discard(self._order.popleft())
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self._ids
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+
+def parse_sender(meta: str) -> str:
+    """Sender from meta: "[HH:MM, DD/MM/YYYY] Name: " (slices, no split lists)."""
+    rb = meta.find("] ")
+    if rb < 0:
+        return "Unknown"
+    co = meta.find(": ", rb + 2)
+    if co < 0:
+        # Already-stripped meta ends in "Name:" without the trailing space
+        if not meta.endswith(":"):
+            return "Unknown"
+        co = len(meta) - 1
+    return meta[rb + 2:co].strip() or "Unknown"
+
+
+def _to_messages(items):
+    """Turn raw {m, t} items from the page into (msg_id, sender, text) tuples."""
+    results = []
+
+    for item in items or []:
+        meta = (item.get("m") or "").strip()
+        sender = parse_sender(meta)
+
+        # IMPORTANT: Use full visible text of the block
+        text = (item.get("t") or "").strip()
+
+        # WhatsApp sometimes includes the time or blank lines—filter empty
+        if not text:
             continue
 
+        msg_id = message_id(meta, text)
+        results.append((msg_id, sender, text))
+
     return results
 
 
+def get_messages(cdp: CdpSession):
+    """
+    Works when data-pre-plain-text exists but selectable-text spans do NOT.
+    Returns list of (msg_id, sender, text).
+    """
+    return _to_messages(cdp.run_compiled(_EXTRACT_MESSAGES_JS))
+
+
+def install_message_observer(cdp: CdpSession):
+    """Start queueing newly rendered message blocks inside the page."""
+    cdp.evaluate(_INSTALL_OBSERVER_JS)
+
+
+def drain_new_messages(cdp: CdpSession):
+    """Return (msg_id, sender, text) for blocks added since the last drain."""
+    return _to_messages(cdp.run_compiled(_DRAIN_QUEUE_JS))
+
+
 def probe_dom(driver):
     probes = {
-        "data-pre-plain-text blocks": "//div[@data-pre-plain-text]",
-        "selectable-text spans": "//span[contains(@class,'selectable-text')]/span",
-        "any role=application": "//*[@role='application']",
-        "message bubble candidates (generic)": "//*[contains(@class,'copyable-text')]",
-        "footer composer": "//footer//div[@contenteditable='true']",
+        "data-pre-plain-text blocks": MSG_BLOCKS,
+        "selectable-text spans": SELECTABLE_TEXT,
+        "any role=application": APPLICATION_ROOT,
+        "message bubble candidates (generic)": COPYABLE_TEXT,
+        "footer composer": COMPOSER,
     }
 
     print("\n[PROBE] DOM probe counts:")
-    for name, xp in probes.items():
+    for name, locator in probes.items():
         try:
-            n = len(driver.find_elements(By.XPATH, xp))
+            n = len(driver.find_elements(*locator))
             print(f"  - {name}: {n}")
         except Exception as e:
             print(f"  - {name}: ERROR {e}")
@@ -234,35 +625,43 @@ def probe_dom(driver):
 
 def main():
     driver = build_driver(cfg)
+    cdp = None
 
     try:
-        wait_for_whatsapp_ready(driver)
+        wait_for_whatsapp_ready(driver, cfg.headless)
         time.sleep(1.5)
 
-        open_group_chat(driver, cfg.group_name)
+        handles = open_group_chat(driver, cfg.group_name)
         probe_dom(driver)
-        
-        # Seed: capture whatever is currently loaded so we only print NEW messages from now on
-        seen_ids = set()
-        for msg_id, _, _ in get_messages(driver):
-            seen_ids.add(msg_id)
-
-        print("[DEBUG] Monitoring started. New messages will print below.\n")
 
-        seen_ids = set()
+        # Selenium handled login + navigation; steady-state polling goes over CDP
+        cdp = CdpSession(driver.capabilities["goog:chromeOptions"]["debuggerAddress"])
+        install_message_observer(cdp)
 
-        # Seed with messages already on screen (so old history isn't dumped)
-        for msg_id, sender, text in get_messages(driver):
+        # Seed: capture whatever is currently loaded so we only print NEW messages from now on
+        seen_ids = SeenIds()
+        for msg_id, _, _ in get_messages(cdp):
             seen_ids.add(msg_id)
 
         print(f"[DEBUG] Seeded {len(seen_ids)} existing messages. Waiting for new ones...\n")
 
+        keywords = build_keyword_automaton(cfg.keywords, cfg.keywords_norm)
+
+        # Scrolling is only needed if the chat may have drifted off the bottom.
+        # Measured in wall time: the poll interval itself backs off while idle.
+        last_activity = time.monotonic()
+        empty_streak = 0
+
         while True:
-            scroll_chat_to_bottom(driver)
+            msgs = drain_new_messages(cdp)
 
-            msgs = get_messages(driver)
+            if msgs:
+                last_activity = time.monotonic()
+            elif time.monotonic() - last_activity >= cfg.scroll_after_idle_seconds:
+                scroll_chat_to_bottom(driver, handles)
+                last_activity = time.monotonic()
 
-            # Print new ones immediately (including the first one that arrives)
+            # Only freshly rendered blocks arrive here; seen_ids guards against re-renders
             new_items = [(mid, s, t) for (mid, s, t) in msgs if mid not in seen_ids]
 
             for msg_id, sender, text in new_items:
@@ -271,17 +670,26 @@ def main():
                 ts = time.strftime("%H:%M:%S")
                 print(f"[{ts}] {sender}: {text}")
 
-                hit = keyword_hit(text, cfg.keywords)
+                hit = keyword_hit(text, keywords)
                 if hit:
                     print(f"🚨 KEYWORD MATCHED: '{hit}' 🚨")
                     play_alarm(cfg)
 
-            time.sleep(cfg.poll_seconds)
+            # Adaptive polling: tight while the chat is active, exponential back-off when quiet
+            if new_items:
+                empty_streak = 0
+                interval = cfg.busy_poll_seconds
+            else:
+                empty_streak = min(empty_streak + 1, 32)  # bounded so 1.5 ** n can't overflow
+                interval = min(cfg.max_poll_seconds, cfg.poll_seconds * (1.5 ** empty_streak))
+            time.sleep(interval)
     except KeyboardInterrupt:
         print("\n[INFO] Stopped by user.")
     except Exception as e:
         print(f"[ERROR] {e}")
     finally:
+        if cdp:
+            cdp.close()
         try:
             driver.quit()
         except Exception: